@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Helpers shared by build_new_blog_posts.py and build_list_items.py.
+
+Both scripts are run as `python scripts/<name>.py`, so this directory is on
+sys.path and they import from here directly.
+"""
+
+from pathlib import Path
+import json
+import re
+import frontmatter
+from slugify import slugify
+
+ROOT = Path(__file__).resolve().parents[1]
+PAGES_DIR = ROOT / "src" / "pages"
+BUILD_INDEX = ROOT / ".build-index.json"   # see load_build_index()
+
+# ---------------- Front matter ----------------
+
+def truthy(v) -> bool:
+    """Tolerant boolean for front matter flags: True / "true" / "True"."""
+    return v is True or (isinstance(v, str) and v.strip().lower() == "true")
+
+def sanitize_md_file(path: Path):
+    """
+    Normalize BOM / line endings / first delimiter. Only rewrites files that change;
+    returns True if it did.
+    """
+    raw = path.read_bytes()
+    data = raw
+    # Strip BOM
+    if data.startswith(b'\xef\xbb\xbf'):
+        data = data[3:]
+    text = data.decode('utf-8', errors='replace')
+    # Normalize line endings
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    # Normalize first delimiter
+    first, sep, rest = text.partition('\n')
+    if first != '---' and first.replace('\u00a0', ' ').strip() == '---':
+        text = '---' + sep + rest
+    cleaned = text.encode('utf-8')
+    if cleaned == raw:
+        return False
+    path.write_bytes(cleaned)
+    return True
+
+def patch_frontmatter(md_text: str, updates: dict[str, str]) -> str:
+    """
+    Set top-level front matter keys in place, leaving every other line (key order,
+    comments, body) untouched. Matched keys are replaced along with any indented or
+    list continuation lines; missing keys are appended before the closing '---'.
+    Values are written verbatim, so callers pass YAML-safe scalars.
+    """
+    lines = md_text.split("\n")
+    if not lines or lines[0].strip() != "---":
+        header = [f"{k}: {v}" for k, v in updates.items()]
+        return "\n".join(["---", *header, "---", md_text])
+    close = next((i for i in range(1, len(lines)) if lines[i].strip() == "---"), None)
+    if close is None:
+        raise ValueError("front matter has no closing '---'")
+
+    key_re = re.compile(rf"^({'|'.join(map(re.escape, updates))})\s*:")
+    header, pending, skipping = [], dict(updates), False
+    for ln in lines[1:close]:
+        if skipping and ln.startswith((" ", "\t", "- ")):
+            continue  # continuation of a value we just replaced
+        skipping = False
+        m = key_re.match(ln)
+        if m and m.group(1) in pending:
+            header.append(f"{m.group(1)}: {pending.pop(m.group(1))}")
+            skipping = True
+        else:
+            header.append(ln)
+    header.extend(f"{k}: {v}" for k, v in pending.items())
+    return "\n".join([lines[0], *header, *lines[close:]])
+
+def flag_probe(key: str) -> re.Pattern:
+    """
+    Byte regex for header_flag_set() matching `<key>: true`. The key must match
+    exactly (front matter keys are case-sensitive); only the value is
+    case-insensitive, like PyYAML's true/True/TRUE.
+    """
+    return re.compile(
+        rb'^' + re.escape(key.encode()) + rb':[ \t]*["\']?(?i:true)["\']?[ \t]*\r?$',
+        re.MULTILINE,
+    )
+
+def header_flag_set(p: Path, probe: re.Pattern) -> bool:
+    """
+    Cheap probe of the first 2 KB: True only if the front matter visibly sets the
+    flag. Anything inconclusive returns False so the caller does a full parse.
+    """
+    with p.open("rb") as f:
+        head = f.read(2048)
+    end = head.find(b"\n---", 3)
+    if end == -1:
+        return False
+    return probe.search(head, 0, end) is not None
+
+# ---------------- Slugs ----------------
+
+_ASCII_SLUG_RE = re.compile(r'[^a-z0-9]+')
+
+def fast_slug(title: str) -> str:
+    """
+    slugify() for the common plain-ASCII title without the Unicode/transliteration
+    passes. '&' (HTML entities) and ',' (digit grouping) get special handling in
+    python-slugify, so titles containing them take the full path.
+    """
+    t = title.strip().lower()
+    if t.isascii() and "&" not in t and "," not in t:
+        return _ASCII_SLUG_RE.sub('-', t).strip('-')
+    return slugify(title)
+
+# ---------------- Build index cache ----------------
+# Local cache, gitignored.
+# {"<md path>": {"mtime_ns", "blog_built", "list_built", "blog_slug", "blog_number",
+#                "astro_mtime_ns"}}. Shared by both build scripts; an entry is only
+# trusted while the .md mtime (and its built page's mtime) still match.
+
+def load_build_index() -> dict:
+    try:
+        return json.loads(BUILD_INDEX.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_build_index(index: dict):
+    text = json.dumps(index, indent=1, sort_keys=True)
+    try:
+        if BUILD_INDEX.read_text(encoding="utf-8") == text:
+            return
+    except FileNotFoundError:
+        pass
+    BUILD_INDEX.write_text(text, encoding="utf-8")
+
+def index_key(p: Path) -> str:
+    return p.relative_to(ROOT).as_posix() if p.is_relative_to(ROOT) else str(p)
+
+def _astro_mtime_ns(slug) -> int | None:
+    try:
+        return (PAGES_DIR / f"{slug}.astro").stat().st_mtime_ns if slug else None
+    except FileNotFoundError:
+        return None
+
+def index_says(entry: dict | None, mtime_ns: int, flag: str) -> bool:
+    """True if a still-valid index entry has `flag` set for this file."""
+    if not entry or entry.get("mtime_ns") != mtime_ns or not entry.get(flag):
+        return False
+    if entry.get("astro_mtime_ns") is not None:
+        return _astro_mtime_ns(entry.get("blog_slug")) == entry["astro_mtime_ns"]
+    return True
+
+def remember(index: dict, p: Path, mtime_ns: int, post: frontmatter.Post | None = None, **fields):
+    """Record what we know about p; a changed mtime starts a fresh entry."""
+    key = index_key(p)
+    entry = index.get(key)
+    if not entry or entry.get("mtime_ns") != mtime_ns:
+        entry = {"mtime_ns": mtime_ns}
+    if post is not None:
+        slug = post.get("blog_slug")
+        entry.update(
+            blog_built=truthy(post.get("blog_built")),
+            list_built=truthy(post.get("list_built")),
+            blog_slug=slug,
+            blog_number=post.get("blog_number"),
+            astro_mtime_ns=_astro_mtime_ns(slug),
+        )
+    entry.update(fields)
+    index[key] = entry
@@ -20,9 +20,13 @@ Run from repo root.
 
 from pathlib import Path
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import frontmatter
-from slugify import slugify
+from _build_common import (
+    truthy, sanitize_md_file, patch_frontmatter, header_flag_set, flag_probe, fast_slug,
+    load_build_index, save_build_index, index_key, index_says, remember,
+)
 
 ROOT = Path(__file__).resolve().parents[1]
 MD_ROOT = ROOT / "src" / "content" / "posts"
@@ -48,18 +52,44 @@ CONTAINER_OPEN = {
     "education":      r'(<div[^>]*class="[^"]*blog-coll-grid[^"]*w-dyn-items[^"]*"[^>]*>)',
 }
 
-def load_candidates():
-    for section in ("policy", "misinformation", "education"):
-        d = MD_ROOT / section
-        if not d.exists():
-            continue
-        for p in d.glob("*.md"):
-            post = frontmatter.load(p)
-            if str(post.get("blog_built")).lower() != "true":
-                continue
-            if str(post.get("list_built")).lower() == "true":
-                continue
-            yield section, p, post
+LIST_BUILT_PROBE_RE = flag_probe("list_built")
+
+def _parse_candidate(section: str, p: Path, entry: dict | None):
+    """
+    Return (section, path, mtime_ns, Post | None, is_candidate); a candidate is
+    blog_built but not list_built. Post is None when the build index or the header
+    probe already shows p as listed, so it was never parsed.
+    """
+    mtime_ns = p.stat().st_mtime_ns
+    if index_says(entry, mtime_ns, "list_built") or header_flag_set(p, LIST_BUILT_PROBE_RE):
+        return section, p, mtime_ns, None, False  # already listed; skip the full parse
+    # Same normalization as build_new_blog_posts; a BOM would hide the front matter
+    if sanitize_md_file(p):
+        mtime_ns = p.stat().st_mtime_ns
+    post = frontmatter.load(p)
+    is_candidate = truthy(post.get("blog_built")) and not truthy(post.get("list_built"))
+    return section, p, mtime_ns, post, is_candidate
+
+def load_candidates(index: dict):
+    """Yield (section, path, Post) for posts needing list entries; records the rest in index."""
+    jobs = [
+        (section, p)
+        for section in ("policy", "misinformation", "education")
+        if (MD_ROOT / section).exists()
+        for p in (MD_ROOT / section).glob("*.md")
+    ]
+    if not jobs:
+        return
+    # Overlap per-post reads; results come back in section order
+    with ThreadPoolExecutor(max_workers=min(32, len(jobs))) as ex:
+        results = ex.map(lambda job: _parse_candidate(*job, index.get(index_key(job[1]))), jobs)
+        for section, p, mtime_ns, post, is_candidate in results:
+            if is_candidate:
+                yield section, p, post
+            elif post is None:
+                remember(index, p, mtime_ns, list_built=True)
+            else:
+                remember(index, p, mtime_ns, post)
 
 def fmt_date(val):
     if not val: return "", ""
@@ -72,13 +102,13 @@ def esc_html(s: str) -> str:
 
 # ---------------- POLICY helpers ----------------
 
+# The managed pages are lowercase, double-quoted HTML, so no IGNORECASE / quote
+# alternation; possessive quantifiers (Python 3.11+) where backtracking can't help.
 POLICY_LINE_BAR_RE = re.compile(
-    r'(<div\s+class="step-line">\s*<div\s+class="step-line-bar"></div>\s*</div>)',
-    re.IGNORECASE
+    r'(<div\s+class="step-line">\s*+<div\s+class="step-line-bar"></div>\s*+</div>)'
 )
 POLICY_LAST_POINT_RE = re.compile(
-    r'(<div\s+class="step-point\s+(_[^"]+)">\s*<div\s+class="step-count">\s*(\d{2})\s*</div>\s*</div>)',
-    re.IGNORECASE
+    r'(<div\s+class="step-point\s+(_[^"]++)">\s*+<div\s+class="step-count">\s*+(\d{2})\s*+</div>\s*+</div>)'
 )
 
 def policy_get_last_point(page_text: str):
@@ -89,10 +119,9 @@ def policy_get_last_point(page_text: str):
     line_bar = POLICY_LINE_BAR_RE.search(page_text)
     if not line_bar:
         return None
-    before = page_text[:line_bar.start()]
     # find the last step-point before the line bar
     last = None
-    for m in POLICY_LAST_POINT_RE.finditer(before):
+    for m in POLICY_LAST_POINT_RE.finditer(page_text, 0, line_bar.start()):
         last = m
     if not last:
         return None
@@ -102,26 +131,25 @@ def policy_insert_new_points(page_text: str, how_many: int):
     """
     Insert 'how_many' new step-point blocks immediately before the step-line-bar.
     Each new block copies the previous class suffix and increments the step-count.
+    The anchor is located once and all blocks are spliced in together.
     Returns (new_text, added_counts_list)
     """
     if how_many <= 0:
         return page_text, []
 
-    added_counts = []
-    text = page_text
-    for _ in range(how_many):
-        found = policy_get_last_point(text)
-        if not found:
-            # Cannot locate structure; bail without changes
-            return text, added_counts
-        full, cls_sfx, count_str, pt_start, pt_end, bar_start, bar_end = found
-        n = int(count_str)
-        n_next = n + 1
-        added_counts.append(n_next)
-        new_point = f'<div class="step-point {cls_sfx}"><div class="step-count">{n_next:02d}</div></div>\n'
-        # Insert just before the line bar
-        text = text[:bar_start] + new_point + text[bar_start:]
-    return text, added_counts
+    found = policy_get_last_point(page_text)
+    if not found:
+        # Cannot locate structure; bail without changes
+        return page_text, []
+    full, cls_sfx, count_str, pt_start, pt_end, bar_start, bar_end = found
+    n = int(count_str)
+    added_counts = list(range(n + 1, n + 1 + how_many))
+    block = "".join(
+        f'<div class="step-point {cls_sfx}"><div class="step-count">{k:02d}</div></div>\n'
+        for k in added_counts
+    )
+    # Insert just before the line bar
+    return "".join([page_text[:bar_start], block, page_text[bar_start:]]), added_counts
 
 # ---------------- BUILDERS ----------------
 
@@ -130,7 +158,7 @@ def build_policy_item(post, display_number: int) -> str:
     title = esc_html(post.get("title") or "")
     short = esc_html(post.get("short_description") or "")
     date_s, year = fmt_date(post.get("date"))
-    slug = post.get("blog_slug") or f'policy_{post.get("blog_number") or 0}_{slugify(title)}'
+    slug = post.get("blog_slug") or f'policy_{post.get("blog_number") or 0}_{fast_slug(title)}'
     head = f"{year} — {title}" if year else title
     href = f"/{slug}"
 
@@ -145,7 +173,7 @@ def build_misinfo_item(post) -> str:
     title = esc_html(post.get("title") or "")
     short = esc_html(post.get("short_description") or "")
     num = post.get("blog_number") or 0
-    slug = post.get("blog_slug") or f'misinformation_{num}_{slugify(title)}'
+    slug = post.get("blog_slug") or f'misinformation_{num}_{fast_slug(title)}'
     href = f"/{slug}"
 
     return f'''\
@@ -169,7 +197,7 @@ def build_education_item(post) -> str:
     cat = esc_html(str(kws[0])) if kws else "Education"
     img = post.get("image") or "https://placehold.co/800x500/jpg"
     num = post.get("blog_number") or 0
-    slug = post.get("blog_slug") or f'education_{num}_{slugify(title)}'
+    slug = post.get("blog_slug") or f'education_{num}_{fast_slug(title)}'
     href = f"/{slug}"
 
     return f'''\
@@ -191,8 +219,9 @@ def build_education_item(post) -> str:
 
 def ensure_markers(section: str, page_text: str) -> str:
     start, end = MARKERS[section]
-    if start in page_text and end in page_text:
-        return page_text
+    i_start = page_text.find(start)
+    if i_start != -1 and page_text.find(end, i_start) != -1:
+        return page_text  # steady state: skip the container regex
     open_re = CONTAINER_OPEN[section]
     open_m = re.search(open_re, page_text)
     if not open_m:
@@ -200,15 +229,22 @@ def ensure_markers(section: str, page_text: str) -> str:
     insert_pos = open_m.end()
     # For policy, we want markers inside .step-right; putting them after the open is fine.
     marker_block = f"\n  {start}\n  {end}\n"
-    return page_text[:insert_pos] + marker_block + page_text[insert_pos:]
+    return "".join([page_text[:insert_pos], marker_block, page_text[insert_pos:]])
 
 def insert_items(section: str, page_text: str, items_html: list[str]) -> str:
     start, end = MARKERS[section]
-    if start not in page_text or end not in page_text:
+    i_start = page_text.find(start)
+    i_end = page_text.find(end, i_start + len(start)) if i_start != -1 else -1
+    if i_end == -1:
         page_text = ensure_markers(section, page_text)
+        i_start = page_text.index(start)
+        i_end = page_text.index(end, i_start + len(start))
 
-    head, body = page_text.split(start, 1)
-    region, tail = body.split(end, 1)
+    # head keeps the start marker and tail keeps the end marker
+    region_start = i_start + len(start)
+    head = page_text[:region_start]
+    region = page_text[region_start:i_end]
+    tail = page_text[i_end:]
 
     region_content = region.strip("\n")
     block = "\n".join(items_html)
@@ -221,38 +257,51 @@ def insert_items(section: str, page_text: str, items_html: list[str]) -> str:
         new_region_inner = (block + ("\n" if region_content else "") + region_content).strip("\n")
 
     new_region = "\n  " + "\n  ".join([ln for ln in new_region_inner.splitlines()]) + "\n"
-    return head + start + new_region + end + tail
+    return f"{head}{new_region}{tail}"
 
 # ---------- MISINFO renumber inside actual container ----------
 
 MISINFO_CONTAINER_OPEN_RE = re.compile(
-    r'<div[^>]*\brole=["\']list["\'][^>]*\bclass=["\'][^"\']*\bw-dyn-items\b[^"\']*["\'][^>]*>',
-    re.IGNORECASE
+    r'<div[^>]*\brole="list"[^>]*\bclass="[^"]*\bw-dyn-items\b[^"]*+"[^>]*+>'
+)
+
+# Exact markup emitted by build_misinfo_item; tried first.
+SERVICE_NUM_RE = re.compile(
+    r'(?P<prefix><div class="service-number">)(?P<num>\d+)(?P<suffix></div>)'
 )
 
+# Fallback for hand-edited items (extra classes/attributes, wrapping <span>).
 SERVICE_NUM_FLEX_RE = re.compile(
-    r'(?P<prefix><div[^>]*\bclass=["\'][^"\']*\bservice-number\b[^"\']*["\'][^>]*>\s*(?:<span[^>]*>\s*)?)'
+    r'(?P<prefix><div[^>]*\bclass="[^"]*\bservice-number\b[^"]*+"[^>]*+>\s*+(?:<span[^>]*+>\s*+)?)'
     r'(?P<num>\d+)'  # the number we’ll replace
-    r'(?P<suffix>\s*(?:</span>)?\s*</div>)',
-    re.IGNORECASE
+    r'(?P<suffix>\s*+(?:</span>)?\s*+</div>)'
 )
 
 def _find_matching_div_close(html: str, start_index: int) -> int:
     """
     From start_index (right after an opening <div ...>), walk forward and return the
     index where the matching closing </div> starts. Returns -1 if not found.
+    Plain str.find scan, no regex; stops as soon as depth reaches 0.
     """
-    tag_re = re.compile(r'<div\b[^>]*>|</div>', re.IGNORECASE)
     depth = 1
-    for m in tag_re.finditer(html, start_index):
-        tok = m.group(0).lower()
-        if tok.startswith('<div'):
-            depth += 1
-        else:
+    pos = start_index
+    while True:
+        next_close = html.find('</div>', pos)
+        if next_close == -1:
+            return -1
+        next_open = html.find('<div', pos, next_close)
+        if next_open == -1:
             depth -= 1
             if depth == 0:
-                return m.start()
-    return -1
+                return next_close
+            pos = next_close + len('</div>')
+        elif html[next_open + 4] in ' \t\r\n/>':
+            depth += 1
+            pos = html.find('>', next_open) + 1
+            if pos == 0:
+                return -1
+        else:
+            pos = next_open + 4  # e.g. <divider>, not a div
 
 def renumber_misinfo_in_container(page_text: str) -> str:
     """
@@ -282,95 +331,114 @@ def renumber_misinfo_in_container(page_text: str) -> str:
         idx += 1
         return f'{m.group("prefix")}{idx:02d}{m.group("suffix")}'
 
-    inner_new = SERVICE_NUM_FLEX_RE.sub(repl, container_inner)
+    inner_new, n = SERVICE_NUM_RE.subn(repl, container_inner)
+    if n != container_inner.count("service-number"):
+        # Some items don't use the exact markup; renumber with the flexible pattern
+        idx = 0
+        inner_new = SERVICE_NUM_FLEX_RE.sub(repl, container_inner)
 
     # Reassemble
-    return page_text[:open_start] + container_open + inner_new + container_close + page_text[close_start+len(container_close):]
-
+    out = [
+        page_text[:open_start],
+        container_open,
+        inner_new,
+        container_close,
+        page_text[close_start+len(container_close):],
+    ]
+    return "".join(out)
+
+
+# ---------------- SECTION handlers ----------------
+# Each takes (page_text, items) and returns (new_page_text, items) where items are
+# the (md_path, post) pairs that were listed, in the order they were inserted.
+
+def build_policy_item_section(page_text: str, items):
+    """POLICY — compute display numbers from step-line, then append."""
+    # For stable list order, sort by blog_number (older first), we append in that order.
+    items = sorted(items, key=lambda t: (t[1].get("blog_number") or 0))
+
+    # Insert one new step-point per item and record the numbers assigned
+    page_text, assigned_numbers = policy_insert_new_points(page_text, how_many=len(items))
+    if not assigned_numbers:
+        raise SystemExit("Policy structure not found (no step-line / step-point to extend).")
+
+    # Build snippets using assigned numbers
+    snippets = [build_policy_item(post, num) for (_, post), num in zip(items, assigned_numbers)]
+    return insert_items("policy", page_text, snippets), items
+
+def build_misinfo_item_section(page_text: str, items):
+    """MISINFORMATION — prepend (newest first in our region) then renumber container."""
+    snippets = [build_misinfo_item(post) for _, post in items]
+    page_text = insert_items("misinformation", page_text, snippets)
+
+    # Now renumber all visible service-number values inside the list container.
+    # Idempotent but walks the whole container, so one call is enough.
+    return renumber_misinfo_in_container(page_text), items
+
+def build_education_item_section(page_text: str, items):
+    """EDUCATION — prepend inside markers."""
+    snippets = [build_education_item(post) for _, post in items]
+    return insert_items("education", page_text, snippets), items
+
+HANDLERS = {
+    "policy":         build_policy_item_section,
+    "misinformation": build_misinfo_item_section,
+    "education":      build_education_item_section,
+}
 
 # ---------------- MAIN ----------------
 
+def process_section(section: str, items, build_stamp: str):
+    """
+    Update one section's .astro page and mark its posts list_built. Sections touch
+    disjoint pages and .md files, so these can run concurrently.
+    Returns (page_path, items) with items in insertion order.
+    """
+    page_path = FILES[section]
+    page_text = page_path.read_text(encoding="utf-8")
+    page_text = ensure_markers(section, page_text)
+    page_text, items = HANDLERS[section](page_text, items)
+
+    # Prepare every front matter writeback before touching disk, then write the page
+    # and its .md files back-to-back. A page must never gain items whose posts are
+    # left without list_built, or the next run would insert them again.
+    pending_writes: list[tuple[Path, str]] = []
+    for md_path, post in items:
+        post.metadata["list_built"] = True
+        post.metadata["list_built_at"] = build_stamp
+        pending_writes.append((md_path, patch_frontmatter(md_path.read_text(encoding="utf-8"), {
+            "list_built": "true",
+            "list_built_at": post["list_built_at"],
+        })))
+
+    page_path.write_text(page_text, encoding="utf-8")
+    for md_path, text in pending_writes:
+        md_path.write_text(text, encoding="utf-8")
+    return page_path, items
+
 def main():
     grouped = {"policy": [], "misinformation": [], "education": []}
-    for section, p, post in load_candidates():
+    index = load_build_index()
+    for section, p, post in load_candidates(index):
         grouped[section].append((p, post))
 
     total = sum(len(v) for v in grouped.values())
     print(f"Found {total} post(s) needing list entries.")
 
-    # POLICY — compute display numbers from step-line, then append
-    if grouped["policy"]:
-        page_path = FILES["policy"]
-        page_text = page_path.read_text(encoding="utf-8")
-        page_text = ensure_markers("policy", page_text)
-
-        # For stable list order, sort by blog_number (older first), we append in that order.
-        items = sorted(grouped["policy"], key=lambda t: (t[1].get("blog_number") or 0))
-
-        # For each new item, insert one new step-point and record the number assigned
-        assigned_numbers = []
-        for _ in items:
-            page_text, added = policy_insert_new_points(page_text, how_many=1)
-            if not added:
-                raise SystemExit("Policy structure not found (no step-line / step-point to extend).")
-            assigned_numbers.append(added[0])
+    rel = lambda p: (p.relative_to(ROOT) if p.is_relative_to(ROOT) else p)
+    # One timestamp for every post listed in this run
+    build_stamp = datetime.now().isoformat(sep="_", timespec="minutes")
 
-        # Build snippets using assigned numbers
-        snippets = [build_policy_item(post, num) for (_, post), num in zip(items, assigned_numbers)]
-        page_text = insert_items("policy", page_text, snippets)
+    work = [(section, items) for section, items in grouped.items() if items]
+    with ThreadPoolExecutor(max_workers=len(FILES)) as ex:
+        results = list(ex.map(lambda job: process_section(*job, build_stamp), work))
 
-        page_path.write_text(page_text, encoding="utf-8")
-
-        # mark md as list_built
+    # Report and update the build index from the main thread, in section order
+    for (section, _), (page_path, items) in zip(work, results):
         for md_path, post in items:
-            post.metadata["list_built"] = True
-            post.metadata["list_built_at"] = datetime.now().isoformat(sep="_", timespec="minutes")
-            md_path.write_text(frontmatter.dumps(post), encoding="utf-8")
-
-        rel = lambda p: (p.relative_to(ROOT) if p.is_relative_to(ROOT) else p)
-        print(f"✓ Updated policy: {rel(page_path)}  (+{len(items)} items)")
-
-    # MISINFORMATION — prepend then renumber container
-    if grouped["misinformation"]:
-        page_path = FILES["misinformation"]
-        page_text = page_path.read_text(encoding="utf-8")
-        page_text = ensure_markers("misinformation", page_text)
-        items = grouped["misinformation"]  # newest first in our region (prepend)
-
-        snippets = [build_misinfo_item(post) for _, post in items]
-        page_text = insert_items("misinformation", page_text, snippets)
-        page_text = renumber_misinfo_in_container(page_text)
-
-        # Now renumber all visible service-number values inside the list container
-        page_text = renumber_misinfo_in_container(page_text)
-
-        page_path.write_text(page_text, encoding="utf-8")
-
-        for md_path, post in items:
-            post.metadata["list_built"] = True
-            post.metadata["list_built_at"] = datetime.now().isoformat(sep="_", timespec="minutes")
-            md_path.write_text(frontmatter.dumps(post), encoding="utf-8")
-
-        rel = lambda p: (p.relative_to(ROOT) if p.is_relative_to(ROOT) else p)
-        print(f"✓ Updated misinformation: {rel(page_path)}  (+{len(items)} items)")
-
-    # EDUCATION — unchanged from your working version (prepend inside markers)
-    if grouped["education"]:
-        page_path = FILES["education"]
-        page_text = page_path.read_text(encoding="utf-8")
-        page_text = ensure_markers("education", page_text)
-        items = grouped["education"]
-        snippets = [build_education_item(post) for _, post in items]
-        page_text = insert_items("education", page_text, snippets)
-        page_path.write_text(page_text, encoding="utf-8")
-
-        for md_path, post in items:
-            post.metadata["list_built"] = True
-            post.metadata["list_built_at"] = datetime.now().isoformat(sep="_", timespec="minutes")
-            md_path.write_text(frontmatter.dumps(post), encoding="utf-8")
-
-        rel = lambda p: (p.relative_to(ROOT) if p.is_relative_to(ROOT) else p)
-        print(f"✓ Updated education: {rel(page_path)}  (+{len(items)} items)")
+            remember(index, md_path, md_path.stat().st_mtime_ns, post)
+        print(f"✓ Updated {section}: {rel(page_path)}  (+{len(items)} items)")
+    save_build_index(index)
 
     if total == 0:
         print("Nothing to do — all built posts already have list entries.")
@@ -8,20 +8,27 @@ Build NEW blog posts only (no args).
     * assigns/persists blog_number per section (stable)
     * renders Markdown -> Astro using your Site layout + elements structure
     * writes to: src/pages/blog/<section>_<num>_<slug>.astro
-    * writes back to the .md front matter:
+    * writes back to the .md front matter (only these keys are touched):
         - blog_built: true
         - blog_built_at: ISO timestamp
         - blog_slug: "<section>_<num>_<slugified-title>"
+        - blog_number: <num>
 
 Run from repo root or ensure cwd is repo root.
 """
 
 from pathlib import Path
 import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from datetime import datetime, timezone
 import frontmatter
-from slugify import slugify
 from markdown_it import MarkdownIt
+from _build_common import (
+    truthy, sanitize_md_file, patch_frontmatter, header_flag_set, flag_probe, fast_slug,
+    load_build_index, save_build_index, index_key, index_says, remember,
+)
 
 # ---------------- Paths ----------------
 ROOT = Path(__file__).resolve().parents[1]
@@ -40,6 +47,24 @@ md = (
     .enable("strikethrough")
 )
 
+INLINE_IMAGE_CLASS = "blog-inline-image"
+RAW_IMG_NO_CLASS_RE = re.compile(r'<img(?![^>]*class=)')
+
+def render_image(self, tokens, idx, options, env):
+    """Markdown images get the inline-image class at render time."""
+    token = tokens[idx]
+    if not token.attrGet("class"):
+        token.attrSet("class", INLINE_IMAGE_CLASS)
+    return self.image(tokens, idx, options, env)
+
+def render_raw_html(self, tokens, idx, options, env):
+    """Raw <img> tags written directly in the post get the same class if they lack one."""
+    return RAW_IMG_NO_CLASS_RE.sub(f'<img class="{INLINE_IMAGE_CLASS}"', tokens[idx].content)
+
+md.add_render_rule("image", render_image)
+md.add_render_rule("html_block", render_raw_html)
+md.add_render_rule("html_inline", render_raw_html)
+
 # ---------------- Astro template ----------------
 ASTRO_POST_TEMPLATE = """---
 import Site from "../layouts/Site.astro";
@@ -63,78 +88,77 @@ import Site from "../layouts/Site.astro";
 """
 
 # ---------------- Helpers ----------------
-def sanitize_md_file(path: Path):
-    raw = path.read_bytes()
-    # Strip BOM
-    if raw.startswith(b'\xef\xbb\xbf'):
-        raw = raw[3:]
-    text = raw.decode('utf-8', errors='replace')
-    # Normalize line endings
-    text = text.replace('\r\n', '\n').replace('\r', '\n')
-    # Normalize first delimiter
-    lines = text.split('\n')
-    if lines and lines[0].replace('\u00a0', ' ').strip() == '---':
-        lines[0] = '---'
-        text = '\n'.join(lines)
-    path.write_text(text, encoding='utf-8')
-
-def read_candidate_markdown():
-    """Yield (path, Post) for .md files that are NOT yet blog_built."""
-    for sec in SECTIONS:
-        sec_dir = MD_ROOT / sec
-        if not sec_dir.exists():
+BLOG_BUILT_PROBE_RE = flag_probe("blog_built")
+
+def _parse_candidate(p: Path, entry: dict | None):
+    """
+    Return (path, mtime_ns, Post | None, is_candidate). Post is None when the build
+    index or the header probe already shows p as built, so it was never parsed.
+    """
+    mtime_ns = p.stat().st_mtime_ns
+    if index_says(entry, mtime_ns, "blog_built") or header_flag_set(p, BLOG_BUILT_PROBE_RE):
+        return p, mtime_ns, None, False  # already built; skip the full parse
+    try:
+        if sanitize_md_file(p):
+            mtime_ns = p.stat().st_mtime_ns
+        post = frontmatter.load(p)              # keep the Post object
+    except Exception as e:
+        raise SystemExit(f"Front matter parse error in: {p}\n→ {e!r}")
+    return p, mtime_ns, post, not truthy(post.get("blog_built"))
+
+def read_candidate_markdown(index: dict):
+    """Yield (path, Post) for .md files that are NOT yet blog_built; records the rest in index."""
+    all_paths = list(chain.from_iterable(
+        (MD_ROOT / sec).glob("*.md") for sec in SECTIONS if (MD_ROOT / sec).exists()
+    ))
+    if not all_paths:
+        return
+    # Overlap the sanitize/parse file I/O across posts; map() keeps glob order
+    with ThreadPoolExecutor(max_workers=min(32, len(all_paths))) as ex:
+        results = ex.map(lambda p: _parse_candidate(p, index.get(index_key(p))), all_paths)
+        for p, mtime_ns, post, is_candidate in results:
+            if is_candidate:
+                yield p, post
+            else:
+                remember(index, p, mtime_ns, post, blog_built=True)
+
+PAGE_NAME_RE = re.compile(rf"^({'|'.join(SECTIONS)})_(\d+)_(.+)$")
+
+def index_existing_pages() -> dict[tuple[str, str], list[int]]:
+    """Scan ASTRO_OUT once and map (section, slug) -> [number, ...] of built pages."""
+    pages = defaultdict(list)
+    for p in ASTRO_OUT.iterdir():
+        if p.suffix != ".astro":
             continue
-        for p in sec_dir.glob("*.md"):
-            try:
-                sanitize_md_file(p)
-                post = frontmatter.load(p)              # keep the Post object
-            except Exception as e:
-                raise SystemExit(f"Front matter parse error in: {p}\n→ {e!r}")
-
-            # tolerant boolean: True / "true" / "True"
-            flag = post.get("blog_built")
-            if isinstance(flag, str):
-                flag = flag.strip().lower() == "true"
-            if flag is True:
-                continue  # skip already-built
-
-            yield p, post                               # yield inside the loop
-
-def collect_existing_numbers(section: str) -> set[int]:
-    """Collect existing numbers from already-built Astro pages for stable numbering."""
-    nums = set()
-    for p in ASTRO_OUT.glob(f"{section}_*_*.astro"):
-        m = re.match(rf"{re.escape(section)}_(\d+)_", p.stem)
+        m = PAGE_NAME_RE.match(p.stem)
         if m:
-            nums.add(int(m.group(1)))
-    return nums
+            pages[(m.group(1), m.group(3))].append(int(m.group(2)))
+    return pages
 
-def find_existing_number_for_slug(section: str, title: str) -> int | None:
+def collect_existing_numbers(section: str, pages) -> set[int]:
+    """Collect existing numbers from already-built Astro pages for stable numbering."""
+    return {n for (sec, _), nums in pages.items() if sec == section for n in nums}
+
+def find_existing_number_for_slug(section: str, slug: str, pages) -> int | None:
     """
-    If a page already exists for this section+title slug, return its number.
+    If a page already exists for this section+slug, return its number.
     Warn if multiple matches (shouldn't happen).
     """
-    slug = slugify(title)
-    matches = list(ASTRO_OUT.glob(f"{section}_*_{slug}.astro"))
-    if not matches:
+    nums = pages.get((section, slug))
+    if not nums:
         return None
-    if len(matches) > 1:
+    if len(nums) > 1:
         print(f"⚠️  Found multiple pages for slug '{section}_{slug}'; "
-              f"reusing lowest number. ({[m.name for m in matches]})")
+              f"reusing lowest number. ({sorted(nums)})")
     # pick the lowest number among matches
-    nums = []
-    for p in matches:
-        m = re.match(rf"{re.escape(section)}_(\d+)_", p.stem)
-        if m:
-            nums.append(int(m.group(1)))
-    return min(nums) if nums else None
+    return min(nums)
 
-def assign_or_reuse_number(section: str, title: str, post: frontmatter.Post) -> int:
+def assign_or_reuse_number(section: str, slug: str, post: frontmatter.Post, pages) -> int:
     """
     Reuse number if an existing page with the same section+title slug exists.
     Otherwise keep a valid blog_number if provided, else assign next available.
     """
-    reuse = find_existing_number_for_slug(section, title)
+    reuse = find_existing_number_for_slug(section, slug, pages)
     if isinstance(reuse, int) and reuse > 0:
         post.metadata["blog_number"] = reuse
         return reuse
@@ -143,7 +167,7 @@ def assign_or_reuse_number(section: str, title: str, post: frontmatter.Post) ->
     if isinstance(existing, int) and existing > 0:
         return existing
 
-    used = collect_existing_numbers(section)
+    used = collect_existing_numbers(section, pages)
     next_num = max(used) + 1 if used else 1
     post.metadata["blog_number"] = next_num
     return next_num
@@ -174,7 +198,11 @@ def render_astro_page(section: str, title: str, date_s: str, author: str, image:
 #     return url
 
 
-def process_one(md_path: Path, post: frontmatter.Post):
+def process_one(md_path: Path, post: frontmatter.Post, pages, built_at: str):
+    """
+    Render one post. Nothing is written here; returns
+    (out_path, astro_text, md_path, post) for main() to flush in one pass.
+    """
     section = (post.get("section") or "").strip().lower()
     title   = (post.get("title") or "").strip()
     if section not in SECTIONS:
@@ -182,45 +210,65 @@ def process_one(md_path: Path, post: frontmatter.Post):
     if not title:
         raise SystemExit(f"{md_path}: front matter 'title' is required")
 
+    slug = fast_slug(title)
     # NEW: reuse number if same section+title exists, else assign next
-    num = assign_or_reuse_number(section, title, post)
+    num = assign_or_reuse_number(section, slug, post, pages)
+    # Record the page so later posts in this run see the number as taken
+    if num not in pages[(section, slug)]:
+        pages[(section, slug)].append(num)
 
     html = md.render(post.content or "")
-    html = re.sub(r'<img(?![^>]*class=)', r'<img class="blog-inline-image"', html)
     # html = re.sub(r'(<img[^>]+src=")(assets/)', r'\1/\2', html)
 
 
-    slug = slugify(title)
     out_name = f"{section}_{num}_{slug}.astro"
     out_path = ASTRO_OUT / out_name
-    ASTRO_OUT.mkdir(parents=True, exist_ok=True)
 
     date_s = (str(post.get("date")) or "").strip()
     author = (post.get("author") or "").strip()
     image  = (post.get("image") or "").strip()
     # image  = ensure_root_absolute(post.get("image") or "")
     astro  = render_astro_page(section, title, date_s, author, image, html)
-    out_path.write_text(astro, encoding="utf-8")
 
     # Mark as built in front matter (idempotent)
     post.metadata["blog_built"] = True
-    post.metadata["blog_built_at"] = datetime.now().isoformat(sep="_", timespec="minutes")
+    post.metadata["blog_built_at"] = built_at
     post.metadata["blog_slug"] = f"{section}_{num}_{slug}"
     post.metadata["blog_number"] = num
-    md_path.write_text(frontmatter.dumps(post), encoding="utf-8")
-
-    rel = lambda p: (p.relative_to(ROOT) if p.is_relative_to(ROOT) else p)
-    print(f"✓ Built/updated: {rel(out_path)}  | marked built in: {rel(md_path)}")
+    return out_path, astro, md_path, post
 
 def main():
     ASTRO_OUT.mkdir(parents=True, exist_ok=True)
-    any_built = False
-    candidates = list(read_candidate_markdown())
+    index = load_build_index()
+    candidates = list(read_candidate_markdown(index))
     print(f"Found {len(candidates)} new/edited candidate post(s).")
+
+    # Render everything first, then flush all page + front matter writes at once.
+    pages = index_existing_pages()
+    # One timestamp for every post built in this run
+    build_stamp = datetime.now().isoformat(sep="_", timespec="minutes")
+    pending_writes: dict[Path, str] = {}
+    built = []
     for md_path, post in candidates:
-        process_one(md_path, post)
-        any_built = True
-    if not any_built:
+        out_path, astro, md_path, post = process_one(md_path, post, pages, build_stamp)
+        pending_writes[out_path] = astro
+        pending_writes[md_path] = patch_frontmatter(md_path.read_text(encoding="utf-8"), {
+            "blog_built": "true",
+            "blog_built_at": post["blog_built_at"],
+            "blog_slug": post["blog_slug"],
+            "blog_number": str(post["blog_number"]),
+        })
+        built.append((out_path, md_path, post))
+
+    for path, text in pending_writes.items():
+        path.write_text(text, encoding="utf-8")
+
+    rel = lambda p: (p.relative_to(ROOT) if p.is_relative_to(ROOT) else p)
+    for out_path, md_path, post in built:
+        remember(index, md_path, md_path.stat().st_mtime_ns, post)
+        print(f"✓ Built/updated: {rel(out_path)}  | marked built in: {rel(md_path)}")
+    save_build_index(index)
+    if not built:
         print("No new markdown posts to build (all are already blog_built).")
 
 if __name__ == "__main__":